@@ -5,6 +5,11 @@ from routes.workouts import router as workouts_router
 from fastapi.middleware.cors import CORSMiddleware
 from routes.diet import diet_router
 from routes.user import user_router
+from routes.reports import reports_router, report_runner, run_report_scheduler
+from routes.writes import writes_router, write_queue
+from routes.snapshots import snapshots_router
+from routes.dashboard import dashboard_router
+import asyncio
 import time
 import os
 
@@ -14,6 +19,20 @@ app = FastAPI()
 app.include_router(workouts_router)
 app.include_router(diet_router)
 app.include_router(user_router)
+app.include_router(reports_router)
+app.include_router(writes_router)
+app.include_router(snapshots_router)
+app.include_router(dashboard_router)
+
+# Precompute coaching reports during off-peak hours
+@app.on_event("startup")
+async def start_report_scheduler():
+    app.state.report_task = asyncio.create_task(run_report_scheduler(report_runner))
+
+# Flush pending queued writes before exiting
+@app.on_event("shutdown")
+def stop_write_queue():
+    write_queue.stop()
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="templates"), name="static")
@@ -0,0 +1,67 @@
+from typing import List, Dict
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy.orm import selectinload
+from datetime import datetime, timedelta
+from routes.db import SessionLocal, Workout as DBWorkout, Diet, Users as DBUsers
+from routes.user import get_current_user, UserResponse
+from routes.workouts import WorkoutResponse, group_workouts_by_date
+from routes.diet import DietResponse, diet_totals
+import asyncio
+
+dashboard_router = APIRouter()
+
+class DashboardResponse(BaseModel):
+    profile: UserResponse
+    workouts: Dict[str, List[WorkoutResponse]]
+    diet: List[DietResponse]
+    diet_totals: dict
+    range: int
+
+# Each read gets its own session so they can run in parallel threads
+def load_recent_workouts(user_id: int, range_days: int) -> Dict[str, List[WorkoutResponse]]:
+    db = SessionLocal()
+    try:
+        query = db.query(DBWorkout).options(selectinload(DBWorkout.sets)).filter(
+            DBWorkout.user_id == user_id
+        )
+        if range_days:
+            since = datetime.now() - timedelta(days=range_days)
+            query = query.filter(DBWorkout.date >= since.replace(hour=0, minute=0, second=0, microsecond=0))
+        return group_workouts_by_date(query.order_by(DBWorkout.date.desc()).all())
+    finally:
+        db.close()
+
+def load_today_diet(user_id: int) -> List[DietResponse]:
+    db = SessionLocal()
+    try:
+        entries = db.query(Diet).filter(
+            (Diet.user_id == user_id) &
+            (Diet.date == datetime.today().strftime("%Y-%m-%d"))
+        ).all()
+        return [DietResponse.model_validate(entry) for entry in entries]
+    finally:
+        db.close()
+
+# Profile, recent workouts and today's diet in one round trip
+@dashboard_router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    range_days: int = Query(7, alias="range", ge=0, le=3650),  # Days of workouts, 0 for all
+    include_workouts: bool = Query(True, alias="workouts"),     # false skips the workouts query
+    current_user: DBUsers = Depends(get_current_user)
+):
+    if include_workouts:
+        workouts, diet = await asyncio.gather(
+            run_in_threadpool(load_recent_workouts, current_user.id, range_days),
+            run_in_threadpool(load_today_diet, current_user.id)
+        )
+    else:
+        workouts, diet = {}, await run_in_threadpool(load_today_diet, current_user.id)
+    return {
+        "profile": current_user,
+        "workouts": workouts,
+        "diet": diet,
+        "diet_totals": diet_totals(diet),
+        "range": range_days
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, text
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from datetime import datetime, timezone
 
@@ -56,10 +56,79 @@ class Diet(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("Users", back_populates="diets")
 
+# One row per (user, kind). data_version is bumped on every write to the user's
+# data; the report is only fresh if it was built from the current version.
+class CoachingReport(Base):
+    __tablename__ = "coaching_reports"
+    __table_args__ = (UniqueConstraint("user_id", "kind"),)
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, index=True)  # "workout" or "diet"
+    content = Column(String, nullable=True)
+    generated_at = Column(DateTime, default=datetime.utcnow)
+    data_version = Column(Integer, default=0)
+    built_version = Column(Integer, nullable=True)
+
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+
+# Cross-process lock so only one app worker runs a scheduled job
+class JobLock(Base):
+    __tablename__ = "job_locks"
+    name = Column(String, primary_key=True)
+    locked_until = Column(DateTime)
+
+# Long-lived refresh tokens, stored as SHA-256 hashes; revoking deletes the row
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String, unique=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime)
+
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+
+# Row ids touched since the last snapshot, filled by triggers below
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String)
+    row_id = Column(Integer)
+
+class SnapshotRun(Base):
+    __tablename__ = "snapshot_runs"
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    rows = Column(Integer)
+
 # DB setup
 engine = create_engine("sqlite:///./workouts.db", connect_args={"check_same_thread": False})
 Base.metadata.create_all(bind=engine)
 
+# Change tracking for incremental snapshots. The triggers only exist once a
+# first snapshot has been written, so change_log stays empty on installs that
+# never take snapshots.
+CHANGE_TRACKED_TABLES = ["workouts", "sets", "diets"]
+CHANGE_EVENTS = (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+
+def enable_change_tracking(conn):
+    for table in CHANGE_TRACKED_TABLES:
+        for event, row in CHANGE_EVENTS:
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_log AFTER {event} ON {table} "
+                f"BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('{table}', {row}.id); END"
+            ))
+
+def disable_change_tracking(conn):
+    for table in CHANGE_TRACKED_TABLES:
+        for event, _ in CHANGE_EVENTS:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_{event.lower()}_log"))
+    conn.execute(text("DELETE FROM change_log"))
+
+with engine.begin() as conn:
+    if conn.execute(text("SELECT 1 FROM snapshot_runs LIMIT 1")).first():
+        enable_change_tracking(conn)
+    else:
+        disable_change_tracking(conn)
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 # Dependency
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from typing import Optional
 from routes.db import get_db, Diet, Users as DBUsers
 from routes.user import get_current_user
+from routes.reports import ACTIVE_USER_DAYS, register_report, get_fresh_report, store_report, invalidate_report, get_data_version
+from routes.foods import food_index
+from routes.writes import write_queue
 import requests
 import google.generativeai as genai
 
@@ -19,6 +23,8 @@ GEMINI_API_KEY = ""
 genai.configure(api_key=GEMINI_API_KEY)
 gemini_model = genai.GenerativeModel("gemini-1.5-flash")
 
+NO_DIET_HISTORY = "No diet history found. Start by logging your meals to get personalized suggestions."
+
 # Request schema
 class DietRequest(BaseModel):
     date: str  # YYYY-MM-DD
@@ -49,6 +55,23 @@ class DietResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Food search result, macros per 100g
+class FoodMatch(BaseModel):
+    name: str
+    calories: float
+    protein: float
+    carbohydrates: float
+    fat: float
+    score: float
+
+# Search the bundled food table
+@diet_router.get("/diet/foods/search", response_model=list[FoodMatch])
+def search_foods(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50)
+):
+    return food_index.search(q, limit)
+
 # Create diet entry
 @diet_router.post("/diet", response_model=DietResponse)
 async def create_diet_entry(
@@ -56,16 +79,31 @@ async def create_diet_entry(
     current_user: DBUsers = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    query = f"{request.quantity}g {request.food}"
-    response = requests.get(api_url + query, headers={'X-Api-Key': DIET_API_KEY})
+    # Exact matches in the bundled food table skip the external API
+    local_food = food_index.lookup(request.food)
+    if local_food:
+        scale = request.quantity / 100
+        item = {
+            'name': local_food['name'],
+            'calories': local_food['calories'] * scale,
+            'protein_g': local_food['protein'] * scale,
+            'carbohydrates_total_g': local_food['carbohydrates'] * scale,
+            'fat_total_g': local_food['fat'] * scale
+        }
+    else:
+        query = f"{request.quantity}g {request.food}"
+        response = requests.get(api_url + query, headers={'X-Api-Key': DIET_API_KEY})
+
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
 
-    if response.status_code == 200:
         data = response.json()
         if not data['items']:
             raise HTTPException(status_code=404, detail="No nutrition info found.")
 
         item = data['items'][0]
 
+    def insert_diet(session: Session) -> Diet:
         db_diet = Diet(
             user_id=current_user.id,
             date=request.date,
@@ -77,14 +115,11 @@ async def create_diet_entry(
             carbohydrates=int(item['carbohydrates_total_g']),
             fat=int(item['fat_total_g'])
         )
-
-        db.add(db_diet)
-        db.commit()
-        db.refresh(db_diet)
-
+        session.add(db_diet)
+        invalidate_report(session, current_user.id, "diet")
         return db_diet
-    else:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
+
+    return await write_queue.write_async(db, insert_diet)
 
 # Get today's diet logs
 @diet_router.get("/diet", response_model=list[DietResponse])
@@ -125,6 +160,7 @@ def delete_diet_entry(
         raise HTTPException(status_code=404, detail="Diet entry not found")
     
     db.delete(diet_entry)
+    invalidate_report(db, current_user.id, "diet")
     db.commit()
     return {"message": "Diet entry deleted successfully"}
 
@@ -154,10 +190,21 @@ def update_diet_entry(
     if request.date is not None:
         diet_entry.date = request.date
     
+    invalidate_report(db, current_user.id, "diet")
     db.commit()
     db.refresh(diet_entry)
     return diet_entry
 
+# Nutrition totals for a list of entries
+def diet_totals(diet_entries: list[Diet]) -> dict:
+    return {
+        "total_calories": sum(entry.calories for entry in diet_entries),
+        "total_protein": sum(entry.protein for entry in diet_entries),
+        "total_carbohydrates": sum(entry.carbohydrates for entry in diet_entries),
+        "total_fat": sum(entry.fat for entry in diet_entries),
+        "entry_count": len(diet_entries)
+    }
+
 # Get diet summary for a date range
 @diet_router.get("/diet/summary/{start_date}/{end_date}")
 def get_diet_summary(
@@ -178,41 +225,19 @@ def get_diet_summary(
         (Diet.date <= end_date)
     ).all()
     
-    if not diet_entries:
-        return {
-            "total_calories": 0,
-            "total_protein": 0,
-            "total_carbohydrates": 0,
-            "total_fat": 0,
-            "entry_count": 0
-        }
-    
-    total_calories = sum(entry.calories for entry in diet_entries)
-    total_protein = sum(entry.protein for entry in diet_entries)
-    total_carbohydrates = sum(entry.carbohydrates for entry in diet_entries)
-    total_fat = sum(entry.fat for entry in diet_entries)
-    
-    return {
-        "total_calories": total_calories,
-        "total_protein": total_protein,
-        "total_carbohydrates": total_carbohydrates,
-        "total_fat": total_fat,
-        "entry_count": len(diet_entries)
-    }
+    return diet_totals(diet_entries)
 
 # AI Diet Suggestions
-@diet_router.post("/diet/suggestions", response_model=dict)
-async def generate_diet_suggestions(
-    current_user: DBUsers = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    # Get user's recent diet entries
+def build_diet_prompt(current_user: DBUsers, db: Session) -> Optional[str]:
+    # Get user's recent diet entries; a multi-day window so the off-peak run
+    # still sees data before anything is logged for the new day
+    since = (datetime.now() - timedelta(days=ACTIVE_USER_DAYS)).strftime("%Y-%m-%d")
     recent_diets = db.query(Diet).filter(
         Diet.user_id == current_user.id
-    ).filter(Diet.date == datetime.now().date()).all()
+    ).filter(Diet.date >= since).order_by(Diet.date.desc(), Diet.id.desc()).all()
 
     if not recent_diets:
-        return {"suggestions": "No diet history found. Start by logging your meals to get personalized suggestions."}
+        return None
     
     # Calculate average daily calories
     daily_calories = {}
@@ -251,11 +276,30 @@ async def generate_diet_suggestions(
 
 Be blunt. No fluff. No emojis. No motivation. Just facts and correction.
     """
-    
+    return prompt
+
+register_report("diet", build_diet_prompt, gemini_model)
+
+@diet_router.post("/diet/suggestions", response_model=dict)
+async def generate_diet_suggestions(
+    current_user: DBUsers = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Serve the precomputed report when it is still fresh
+    report = get_fresh_report(db, current_user.id, "diet")
+    if report:
+        return {"suggestions": report.content}
+
+    data_version = get_data_version(db, current_user.id, "diet")
+    prompt = build_diet_prompt(current_user, db)
+    if prompt is None:
+        return {"suggestions": NO_DIET_HISTORY}
+
     try:
         response = await run_in_threadpool(
             lambda: gemini_model.generate_content(prompt)
         )
+        store_report(db, current_user.id, "diet", response.text, data_version)
         return {"suggestions": response.text}
     except Exception as e:
         return {"suggestions": f"Unable to generate suggestions: {str(e)}"}
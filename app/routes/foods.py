@@ -0,0 +1,69 @@
+from collections import defaultdict
+from typing import Optional
+import csv
+import os
+
+# Bundled food table, nutrition values per 100g
+FOODS_CSV = os.path.join(os.path.dirname(__file__), "..", "data", "foods.csv")
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FoodIndex:
+    def __init__(self, foods: list[dict]):
+        self.foods = foods
+        self.by_name = {food["name"]: food for food in foods}
+        self.food_trigrams = [trigrams(food["name"]) for food in foods]
+        self.postings = defaultdict(list)  # trigram -> food indexes
+        for i, grams in enumerate(self.food_trigrams):
+            for gram in grams:
+                self.postings[gram].append(i)
+
+    @classmethod
+    def from_csv(cls, path: str = FOODS_CSV) -> "FoodIndex":
+        with open(path, newline="", encoding="utf-8") as f:
+            foods = [
+                {
+                    "name": normalize(row["name"]),
+                    "calories": float(row["calories"]),
+                    "protein": float(row["protein"]),
+                    "carbohydrates": float(row["carbohydrates"]),
+                    "fat": float(row["fat"]),
+                }
+                for row in csv.DictReader(f)
+            ]
+        return cls(foods)
+
+    def lookup(self, name: str) -> Optional[dict]:
+        return self.by_name.get(normalize(name))
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        query = normalize(query)
+        if not query:
+            return []
+
+        query_grams = trigrams(query)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] += 1
+
+        scored = []
+        for i, count in shared.items():
+            food = self.foods[i]
+            # Dice coefficient over trigrams, with a bonus for prefix matches
+            score = 2 * count / (len(query_grams) + len(self.food_trigrams[i]))
+            if food["name"].startswith(query):
+                score += 1
+            elif any(word.startswith(query) for word in food["name"].split()):
+                score += 0.5
+            scored.append((score, food["name"], food))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [dict(food, score=round(score, 3)) for score, _, food in scored[:limit]]
+
+food_index = FoodIndex.from_csv()
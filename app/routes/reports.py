@@ -0,0 +1,220 @@
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from routes.db import SessionLocal, CoachingReport, JobLock, Workout, Diet, Users
+from routes.user import get_current_user
+import asyncio
+import threading
+import time
+
+reports_router = APIRouter()
+
+# Report configuration
+REPORT_RUN_HOUR = 4          # Local hour for the off-peak precompute run
+REPORT_WORKERS = 4           # Max concurrent model calls during a run
+REPORT_MAX_AGE_HOURS = 24    # Stored reports older than this are stale
+ACTIVE_USER_DAYS = 7         # Users with activity in this window get reports
+REPORT_LOCK_HOURS = 6        # One worker per deployment claims the daily run for this long
+
+# kind -> (build_prompt(user, db) -> str | None, model)
+_report_builders = {}
+
+def register_report(kind: str, build_prompt, model):
+    _report_builders[kind] = (build_prompt, model)
+
+# Fake model for running the job runner without Gemini
+class FakeModel:
+    def __init__(self, text: str = "Fake coaching report.", fail: bool = False):
+        self.text = text
+        self.fail = fail
+        self.prompts = []
+
+    def generate_content(self, prompt: str):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("Fake model failure")
+        return SimpleNamespace(text=self.text)
+
+# Report storage
+def get_fresh_report(db: Session, user_id: int, kind: str):
+    cutoff = datetime.utcnow() - timedelta(hours=REPORT_MAX_AGE_HOURS)
+    return db.query(CoachingReport).filter(
+        CoachingReport.user_id == user_id,
+        CoachingReport.kind == kind,
+        CoachingReport.content.isnot(None),
+        CoachingReport.built_version == CoachingReport.data_version,
+        CoachingReport.generated_at >= cutoff
+    ).first()
+
+# Watermark to read before building a prompt and pass to store_report
+def get_data_version(db: Session, user_id: int, kind: str) -> int:
+    version = db.query(CoachingReport.data_version).filter(
+        CoachingReport.user_id == user_id,
+        CoachingReport.kind == kind
+    ).scalar()
+    return version or 0
+
+# Returns False without writing if the user's data changed after data_version was read
+def store_report(db: Session, user_id: int, kind: str, content: str, data_version: int) -> bool:
+    now = datetime.utcnow()
+    table = CoachingReport.__table__
+    stmt = insert(table).values(
+        user_id=user_id,
+        kind=kind,
+        content=content,
+        generated_at=now,
+        data_version=data_version,
+        built_version=data_version
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "kind"],
+        set_={"content": content, "generated_at": now, "built_version": data_version},
+        where=table.c.data_version == data_version
+    )
+    stored = db.execute(stmt).rowcount > 0
+    db.commit()
+    return stored
+
+# Marks the stored report stale after the user's data changes; committed by the caller
+def invalidate_report(db: Session, user_id: int, kind: str):
+    table = CoachingReport.__table__
+    stmt = insert(table).values(user_id=user_id, kind=kind, data_version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "kind"],
+        set_={"data_version": table.c.data_version + 1}
+    )
+    db.execute(stmt)
+
+# Background job runner
+class ReportRunner:
+    def __init__(self, model=None, max_workers: int = REPORT_WORKERS, session_factory=SessionLocal):
+        self.model = model  # Overrides every registered model, e.g. with FakeModel
+        self.max_workers = max_workers
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self.stats = {
+            "runs": 0,
+            "jobs_generated": 0,
+            "jobs_skipped": 0,
+            "jobs_stale": 0,
+            "jobs_failed": 0,
+            "last_run_started": None,
+            "last_run_duration": None,
+            "last_run_jobs_per_second": None,
+            "last_errors": [],
+        }
+
+    def active_user_ids(self, db: Session) -> list[int]:
+        cutoff = datetime.utcnow() - timedelta(days=ACTIVE_USER_DAYS)
+        workout_users = db.query(Workout.user_id).filter(Workout.date >= cutoff)
+        diet_users = db.query(Diet.user_id).filter(Diet.date >= cutoff.strftime("%Y-%m-%d"))
+        return sorted({row[0] for row in workout_users.union(diet_users).all()})
+
+    def generate(self, user_id: int, kind: str) -> str:
+        build_prompt, model = _report_builders[kind]
+        db = self.session_factory()
+        try:
+            user = db.query(Users).filter(Users.id == user_id).first()
+            if user is None:
+                return "skipped"
+            data_version = get_data_version(db, user_id, kind)
+            prompt = build_prompt(user, db)
+            if prompt is None:
+                return "skipped"
+            response = (self.model or model).generate_content(prompt)
+            if not store_report(db, user_id, kind, response.text, data_version):
+                return "stale"
+            return "generated"
+        finally:
+            db.close()
+
+    def run(self) -> dict:
+        started = datetime.utcnow()
+        start_time = time.time()
+
+        db = self.session_factory()
+        try:
+            user_ids = self.active_user_ids(db)
+        finally:
+            db.close()
+
+        counts = {"generated": 0, "skipped": 0, "stale": 0, "failed": 0}
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self.generate, user_id, kind): (user_id, kind)
+                for user_id in user_ids
+                for kind in _report_builders
+            }
+            for future in as_completed(futures):
+                user_id, kind = futures[future]
+                try:
+                    counts[future.result()] += 1
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"[reports] {kind} report for user {user_id} failed: {e}")
+                    errors.append({"kind": kind, "error": type(e).__name__})
+
+        duration = time.time() - start_time
+        jobs = sum(counts.values())
+        with self._lock:
+            self.stats["runs"] += 1
+            self.stats["jobs_generated"] += counts["generated"]
+            self.stats["jobs_skipped"] += counts["skipped"]
+            self.stats["jobs_stale"] += counts["stale"]
+            self.stats["jobs_failed"] += counts["failed"]
+            self.stats["last_run_started"] = started.isoformat()
+            self.stats["last_run_duration"] = round(duration, 3)
+            self.stats["last_run_jobs_per_second"] = round(jobs / duration, 2) if duration else None
+            self.stats["last_errors"] = errors[-20:]
+
+        print(f"[reports] {jobs} jobs for {len(user_ids)} users - "
+              f"{counts['generated']} generated, {counts['skipped']} skipped, "
+              f"{counts['stale']} stale, {counts['failed']} failed - {duration:.3f}s")
+        return {"users": len(user_ids), "duration": duration, **counts}
+
+def seconds_until_next_run(now: datetime | None = None) -> float:
+    now = now or datetime.now()
+    next_run = now.replace(hour=REPORT_RUN_HOUR, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+# Every app worker runs the scheduler; the first to claim the lock row does the run
+def acquire_job_lock(name: str, hours: float = REPORT_LOCK_HOURS, session_factory=SessionLocal) -> bool:
+    now = datetime.utcnow()
+    table = JobLock.__table__
+    stmt = insert(table).values(name=name, locked_until=now + timedelta(hours=hours))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"locked_until": now + timedelta(hours=hours)},
+        where=table.c.locked_until < now
+    )
+    db = session_factory()
+    try:
+        acquired = db.execute(stmt).rowcount > 0
+        db.commit()
+        return acquired
+    finally:
+        db.close()
+
+async def run_report_scheduler(runner: ReportRunner):
+    while True:
+        await asyncio.sleep(seconds_until_next_run())
+        try:
+            if await run_in_threadpool(acquire_job_lock, "reports"):
+                await run_in_threadpool(runner.run)
+        except Exception as e:
+            print(f"[reports] Run failed: {e}")
+
+report_runner = ReportRunner()
+
+# Job runner stats
+@reports_router.get("/reports/stats", response_model=dict)
+def get_report_stats(current_user: Users = Depends(get_current_user)):
+    with report_runner._lock:
+        return dict(report_runner.stats)
@@ -0,0 +1,150 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from sqlalchemy import func, Integer, DateTime
+from routes.db import (
+    get_db, SessionLocal, ChangeLog, SnapshotRun, Workout, Set, Diet, Users as DBUsers,
+    enable_change_tracking
+)
+from routes.user import get_current_user
+import pyarrow as pa
+import pyarrow.compute as pc
+import glob
+import os
+
+snapshots_router = APIRouter()
+
+# Snapshot configuration
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "..", "snapshots")
+SNAPSHOT_TABLES = {"workouts": Workout, "sets": Set, "diets": Diet}
+ID_CHUNK_SIZE = 500  # Keeps IN (...) lists under SQLite's variable limit
+
+def arrow_schema(model) -> pa.Schema:
+    fields = []
+    for column in model.__table__.columns:
+        if isinstance(column.type, Integer):
+            fields.append(pa.field(column.name, pa.int64()))
+        elif isinstance(column.type, DateTime):
+            fields.append(pa.field(column.name, pa.timestamp("us")))
+        else:
+            fields.append(pa.field(column.name, pa.string()))
+    fields.append(pa.field("_deleted", pa.bool_()))
+    fields.append(pa.field("_snapshot_id", pa.int64()))
+    return pa.schema(fields)
+
+def changed_rows(db: Session, model, row_ids: list[int]) -> dict:
+    rows = {}
+    for i in range(0, len(row_ids), ID_CHUNK_SIZE):
+        chunk = row_ids[i:i + ID_CHUNK_SIZE]
+        for row in db.query(model).filter(model.id.in_(chunk)).all():
+            rows[row.id] = row
+    return rows
+
+def build_table(model, rows: list, deleted_ids: list[int], snapshot_id: int) -> pa.Table:
+    schema = arrow_schema(model)
+    columns = {field.name: [] for field in schema}
+    for row in rows:
+        for column in model.__table__.columns:
+            columns[column.name].append(getattr(row, column.name))
+        columns["_deleted"].append(False)
+    for row_id in deleted_ids:
+        for column in model.__table__.columns:
+            columns[column.name].append(row_id if column.name == "id" else None)
+        columns["_deleted"].append(True)
+    columns["_snapshot_id"] = [snapshot_id] * (len(rows) + len(deleted_ids))
+    return pa.table(columns, schema=schema)
+
+# Writes rows changed since the last snapshot (everything on the first run)
+# as one Arrow IPC file per table under <table>/snapshot_id=<n>/
+def write_snapshot(db: Session, out_dir: str = SNAPSHOT_DIR) -> dict:
+    last_run = db.query(SnapshotRun).order_by(SnapshotRun.id.desc()).first()
+    # The change log is pruned after every run, so whatever is left is unsnapshotted
+    max_change_id = db.query(func.max(ChangeLog.id)).scalar() or 0
+    if last_run and not max_change_id:
+        return {"snapshot_id": None, "rows": 0, "tables": {}}
+
+    if last_run is None:
+        # Start logging changes in the same transaction as the full export
+        enable_change_tracking(db.connection())
+
+    run = SnapshotRun(rows=0)
+    db.add(run)
+    db.flush()
+
+    tables = {}
+    for table_name, model in SNAPSHOT_TABLES.items():
+        if last_run is None:
+            rows = db.query(model).order_by(model.id).all()
+            deleted_ids = []
+        else:
+            row_ids = sorted({row_id for (row_id,) in db.query(ChangeLog.row_id).filter(
+                ChangeLog.table_name == table_name,
+                ChangeLog.id <= max_change_id
+            )})
+            live = changed_rows(db, model, row_ids)
+            rows = [live[row_id] for row_id in row_ids if row_id in live]
+            deleted_ids = [row_id for row_id in row_ids if row_id not in live]
+
+        if not rows and not deleted_ids:
+            continue
+
+        partition = os.path.join(out_dir, table_name, f"snapshot_id={run.id}")
+        os.makedirs(partition, exist_ok=True)
+        table = build_table(model, rows, deleted_ids, run.id)
+        with pa.OSFile(os.path.join(partition, "part-0.arrow"), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        tables[table_name] = table.num_rows
+        run.rows += table.num_rows
+
+    # Changes up to max_change_id are now captured in files
+    db.query(ChangeLog).filter(ChangeLog.id <= max_change_id).delete()
+    db.commit()
+    return {"snapshot_id": run.id, "rows": run.rows, "tables": tables}
+
+# Memory-maps every snapshot of a table and keeps the latest version of each row
+def load_snapshot(table_name: str, out_dir: str = SNAPSHOT_DIR) -> pa.Table:
+    paths = sorted(glob.glob(os.path.join(out_dir, table_name, "snapshot_id=*", "*.arrow")))
+    if not paths:
+        return arrow_schema(SNAPSHOT_TABLES[table_name]).empty_table()
+
+    parts = [pa.ipc.open_file(pa.memory_map(path, "r")).read_all() for path in paths]
+    table = pa.concat_tables(parts).sort_by([("id", "ascending"), ("_snapshot_id", "descending")])
+
+    ids = table["id"].combine_chunks()
+    is_latest = pa.concat_arrays([
+        pa.array([True]),
+        pc.not_equal(ids.slice(1), ids.slice(0, len(ids) - 1))
+    ]) if len(ids) else pa.array([], pa.bool_())
+    latest = table.filter(is_latest)
+    return latest.filter(pc.invert(latest["_deleted"]))
+
+# Write a snapshot
+@snapshots_router.post("/snapshots", response_model=dict)
+def create_snapshot(
+    current_user: DBUsers = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return write_snapshot(db)
+
+# List snapshot runs
+@snapshots_router.get("/snapshots", response_model=list[dict])
+def list_snapshots(
+    current_user: DBUsers = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return [
+        {
+            "snapshot_id": run.id,
+            "created_at": run.created_at.isoformat(),
+            "rows": run.rows
+        }
+        for run in db.query(SnapshotRun).order_by(SnapshotRun.id).all()
+    ]
+
+if __name__ == "__main__":
+    # Run from app/: python -m routes.snapshots
+    db = SessionLocal()
+    try:
+        print(write_snapshot(db))
+    finally:
+        db.close()
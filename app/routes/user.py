@@ -3,9 +3,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from routes.db import get_db, Users
+from routes.db import get_db, Users, RefreshToken
 import jwt
 import bcrypt
+import hashlib
+import secrets
 from typing import Optional
 
 user_router = APIRouter()
@@ -15,6 +17,7 @@ security = HTTPBearer()
 SECRET_KEY = "your-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = 30
 
 # Models
 class UserCreate(BaseModel):
@@ -50,10 +53,14 @@ class UserResponse(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str
     user_id: int
     username: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 # Password hashing functions
 def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
@@ -83,6 +90,42 @@ def verify_token(token: str) -> dict:
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+# Refresh token functions
+# Refresh tokens are random and high-entropy, so a plain SHA-256 is enough and keeps bcrypt off this path
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def create_refresh_token(db: Session, user_id: int) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    deleted = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_refresh_token(token)
+    ).delete()
+    return deleted > 0
+
+def issue_tokens(db: Session, user: Users) -> dict:
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+    refresh_token = create_refresh_token(db, user.id)
+    db.commit()
+
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "user_id": user.id,
+        "username": user.username
+    }
+
 # Authentication dependency
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
     token = credentials.credentials
@@ -107,18 +150,33 @@ def authenticate_user(db: Session, username: str, password: str) -> Users:
 @user_router.post("/login", response_model=Token)
 def login(user: UserLogin, db: Session = Depends(get_db)):
     user_in_db = authenticate_user(db, user.username, user.password)
-    
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user_in_db.id)}, expires_delta=access_token_expires
-    )
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user_id": user_in_db.id,
-        "username": user_in_db.username
-    }
+
+    # Drop this user's expired refresh tokens
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user_in_db.id,
+        RefreshToken.expires_at < datetime.utcnow()
+    ).delete()
+
+    return issue_tokens(db, user_in_db)
+
+# Refresh route (no password check, so no bcrypt)
+@user_router.post("/token/refresh", response_model=Token)
+def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    stored = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+    ).first()
+    if stored is None or stored.expires_at < datetime.utcnow():
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    # Rotate: the presented token is single-use. The delete also loses races between concurrent refreshes
+    user_id = stored.user_id
+    if not revoke_refresh_token(db, request.refresh_token):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user = db.query(Users).filter(Users.id == user_id).first()
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return issue_tokens(db, user)
 
 # Register route
 @user_router.post("/signup", response_model=UserResponse)
@@ -158,9 +216,12 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 def get_current_user_info(current_user: Users = Depends(get_current_user)):
     return current_user
 
-# Logout route (client-side token removal)
+# Logout route (revokes the refresh token; the access token expires on its own)
 @user_router.post("/logout")
-def logout():
+def logout(request: Optional[RefreshRequest] = None, db: Session = Depends(get_db)):
+    if request is not None:
+        revoke_refresh_token(db, request.refresh_token)
+        db.commit()
     return {"message": "Successfully logged out"}
 
 # Get all users (for admin purposes)
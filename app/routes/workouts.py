@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from routes.db import get_db, Workout as DBWorkout, Set as DBSet, Users as DBUsers
 from routes.user import get_current_user
+from routes.reports import register_report, get_fresh_report, store_report, invalidate_report, get_data_version
+from routes.writes import write_queue
 # Gemini (Google Generative AI)
 import google.generativeai as genai
 
@@ -16,6 +18,8 @@ gemini_model = genai.GenerativeModel("gemini-1.5-flash")
 
 router = APIRouter()
 
+NO_WORKOUT_HISTORY = "No workout history found. Start with basic exercises like push-ups, squats, and planks."
+
 # === Pydantic Models ===
 class SetDetails(BaseModel):
     reps: str
@@ -46,26 +50,24 @@ def create_workout(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
 
-    db_workout = DBWorkout(
-        muscle_group=workout.muscle_group,
-        workout_type=workout.workout_type,
-        date=workout_date,
-        notes=workout.notes,
-        user_id=current_user.id,
-        sets=[DBSet(reps=s.reps, weight=s.weight) for s in workout.sets]
-    )
-    db.add(db_workout)
-    db.commit()
-    db.refresh(db_workout)
+    def insert_workout(session: Session) -> DBWorkout:
+        db_workout = DBWorkout(
+            muscle_group=workout.muscle_group,
+            workout_type=workout.workout_type,
+            date=workout_date,
+            notes=workout.notes,
+            user_id=current_user.id,
+            sets=[DBSet(reps=s.reps, weight=s.weight) for s in workout.sets]
+        )
+        session.add(db_workout)
+        invalidate_report(session, current_user.id, "workout")
+        return db_workout
+
+    db_workout = write_queue.write(db, insert_workout)
     return {"message": "Workout added", "workout_id": db_workout.id}
 
 # === Get Workouts Grouped by Date ===
-@router.get("/workouts", response_model=Dict[str, List[WorkoutResponse]])
-def get_user_workouts(current_user: DBUsers = Depends(get_current_user), db: Session = Depends(get_db)):
-    workouts = db.query(DBWorkout).filter(DBWorkout.user_id == current_user.id).all()
-    if not workouts:
-        return {}
-
+def group_workouts_by_date(workouts: List[DBWorkout]) -> Dict[str, List[WorkoutResponse]]:
     grouped = {}
     for w in workouts:
         date_str = w.date.strftime("%Y-%m-%d")
@@ -81,6 +83,11 @@ def get_user_workouts(current_user: DBUsers = Depends(get_current_user), db: Ses
         grouped.setdefault(date_str, []).append(wr)
     return grouped
 
+@router.get("/workouts", response_model=Dict[str, List[WorkoutResponse]])
+def get_user_workouts(current_user: DBUsers = Depends(get_current_user), db: Session = Depends(get_db)):
+    workouts = db.query(DBWorkout).filter(DBWorkout.user_id == current_user.id).all()
+    return group_workouts_by_date(workouts)
+
 # === Get Workout by ID ===
 @router.get("/workout/{workout_id}", response_model=WorkoutResponse)
 def get_workout_by_id(
@@ -135,6 +142,7 @@ def update_workout(
     db.query(DBSet).filter(DBSet.workout_id == workout_id).delete()
     workout.sets = [DBSet(reps=s.reps, weight=s.weight) for s in updated.sets]
 
+    invalidate_report(db, current_user.id, "workout")
     db.commit()
     return {"message": "Workout updated successfully"}
 
@@ -153,22 +161,19 @@ def delete_workout(
         raise HTTPException(status_code=404, detail="Workout not found")
 
     db.delete(workout)
+    invalidate_report(db, current_user.id, "workout")
     db.commit()
     return {"message": "Workout deleted successfully"}
 
 # === AI Suggestions ===
-@router.get("/ai-suggestions")
-async def get_ai_suggestions(
-    current_user: DBUsers = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+def build_workout_prompt(current_user: DBUsers, db: Session) -> Optional[str]:
     # Get user's recent workouts
     recent_workouts = db.query(DBWorkout).filter(
         DBWorkout.user_id == current_user.id
     ).order_by(DBWorkout.date.desc()).limit(5).all()
 
     if not recent_workouts:
-        return {"suggestions": "No workout history found. Start with basic exercises like push-ups, squats, and planks."}
+        return None
 
     # Create context for AI
     workout_history = []
@@ -221,13 +226,30 @@ Analyze the user’s profile and past 7-day workout history. Return output only
 
 Be raw, bold, and strict. No emojis, no markdown symbols, no decoration. Only give results — no motivation or praise. Keep it all business.
 """
+    return prompt
 
+register_report("workout", build_workout_prompt, gemini_model)
+
+@router.get("/ai-suggestions")
+async def get_ai_suggestions(
+    current_user: DBUsers = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Serve the precomputed report when it is still fresh
+    report = get_fresh_report(db, current_user.id, "workout")
+    if report:
+        return {"suggestions": report.content}
 
+    data_version = get_data_version(db, current_user.id, "workout")
+    prompt = build_workout_prompt(current_user, db)
+    if prompt is None:
+        return {"suggestions": NO_WORKOUT_HISTORY}
 
     try:
         response = await run_in_threadpool(
             lambda: gemini_model.generate_content(prompt)
         )
+        store_report(db, current_user.id, "workout", response.text, data_version)
         return {"suggestions": response.text}
     except Exception as e:
         return {"suggestions": f"Unable to generate suggestions: {str(e)}"}
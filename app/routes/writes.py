@@ -0,0 +1,166 @@
+from fastapi import APIRouter
+from sqlalchemy.orm import Session
+from concurrent.futures import Future
+from routes.db import SessionLocal
+import asyncio
+import queue
+import threading
+import time
+
+writes_router = APIRouter()
+
+# Write queue configuration
+WRITE_QUEUE_ENABLED = False     # Off: every write commits in its own request session
+WRITE_BATCH_MAX_ROWS = 50       # Flush once this many writes are pending
+WRITE_BATCH_MAX_DELAY_MS = 5    # ...or once the oldest pending write waited this long
+
+# Group-commit write queue
+#
+# A job is a callable taking a session, adding its rows and returning the
+# object the caller wants back. Jobs from concurrent requests are run by a
+# single writer thread and committed together in one transaction; callers
+# only get their object (with its id assigned) after that commit.
+class WriteQueue:
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        enabled: bool = WRITE_QUEUE_ENABLED,
+        max_rows: int = WRITE_BATCH_MAX_ROWS,
+        max_delay_ms: float = WRITE_BATCH_MAX_DELAY_MS
+    ):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.max_rows = max_rows
+        self.max_delay_ms = max_delay_ms
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "batches": 0,
+            "rows": 0,
+            "failed_rows": 0,
+            "max_batch_size": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def submit(self, job) -> Future:
+        future = Future()
+        self.start()
+        self._queue.put((job, future, time.perf_counter()))
+        return future
+
+    def write(self, db: Session, job):
+        if not self.enabled:
+            obj = job(db)
+            db.commit()
+            db.refresh(obj)
+            return obj
+        # Hand the request's pooled connection back while waiting on the writer thread
+        db.close()
+        return self.submit(job).result()
+
+    async def write_async(self, db: Session, job):
+        if not self.enabled:
+            return self.write(db, job)
+        db.close()
+        return await asyncio.wrap_future(self.submit(job))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.max_delay_ms / 1000
+            stopping = False
+            while len(batch) < self.max_rows:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: list):
+        session = self.session_factory(expire_on_commit=False)
+        failed = 0
+        try:
+            try:
+                results = [job(session) for job, _, _ in batch]
+                session.commit()
+            except Exception:
+                session.rollback()
+                results = None
+
+            if results is not None:
+                for (_, future, _), obj in zip(batch, results):
+                    future.set_result(obj)
+            else:
+                # Retry one by one so a single bad write does not fail the whole batch
+                for job, future, _ in batch:
+                    try:
+                        obj = job(session)
+                        session.commit()
+                        future.set_result(obj)
+                    except Exception as e:
+                        session.rollback()
+                        future.set_exception(e)
+                        failed += 1
+        finally:
+            session.close()
+
+        now = time.perf_counter()
+        latencies = [(now - submitted) * 1000 for _, _, submitted in batch]
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["rows"] += len(batch)
+            self.stats["failed_rows"] += failed
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+            self.stats["total_latency_ms"] += sum(latencies)
+            self.stats["max_latency_ms"] = max(self.stats["max_latency_ms"], max(latencies))
+
+    def report(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        batches, rows = stats["batches"], stats["rows"]
+        return {
+            "enabled": self.enabled,
+            "max_rows": self.max_rows,
+            "max_delay_ms": self.max_delay_ms,
+            "batches": batches,
+            "rows": rows,
+            "failed_rows": stats["failed_rows"],
+            "avg_batch_size": round(rows / batches, 2) if batches else 0,
+            "max_batch_size": stats["max_batch_size"],
+            "avg_latency_ms": round(stats["total_latency_ms"] / rows, 3) if rows else 0,
+            "max_latency_ms": round(stats["max_latency_ms"], 3),
+        }
+
+write_queue = WriteQueue()
+
+# Write queue stats
+@writes_router.get("/writes/stats", response_model=dict)
+def get_write_stats():
+    return write_queue.report()
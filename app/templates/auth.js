@@ -0,0 +1,128 @@
+// Shared authentication helpers for the app pages, served at /static/auth.js
+
+// Authentication check
+function checkAuth() {
+  const token = localStorage.getItem('authToken');
+  if (!token) {
+    window.location.href = 'login.html';
+    return false;
+  }
+  return true;
+}
+
+// Get auth headers
+function getAuthHeaders() {
+  const token = localStorage.getItem('authToken');
+  return {
+    'Content-Type': 'application/json',
+    'Authorization': `Bearer ${token}`
+  };
+}
+
+// Refresh tokens are single-use, so tabs take turns through a Web Lock
+function withRefreshLock(callback) {
+  if (navigator.locks) {
+    return navigator.locks.request('token-refresh', callback);
+  }
+  return callback();
+}
+
+// Swap the refresh token for a new access token without re-entering the password.
+// seenRefreshToken is the token that was stored when the failed request was sent;
+// if another tab rotated it in the meantime, its new tokens are used instead.
+// Concurrent callers in this tab share one request.
+let refreshPromise = null;
+function refreshAccessToken(seenRefreshToken = localStorage.getItem('refreshToken')) {
+  if (!refreshPromise) {
+    refreshPromise = withRefreshLock(async () => {
+      const refreshToken = localStorage.getItem('refreshToken');
+      if (!refreshToken) return false;
+      if (refreshToken !== seenRefreshToken) return true;
+      try {
+        const response = await fetch('http://localhost:8000/token/refresh', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ refresh_token: refreshToken })
+        });
+        if (!response.ok) {
+          // Without Web Locks another tab may still have rotated the token first
+          return localStorage.getItem('refreshToken') !== refreshToken;
+        }
+        const data = await response.json();
+        localStorage.setItem('authToken', data.access_token);
+        localStorage.setItem('refreshToken', data.refresh_token);
+        return true;
+      } catch (error) {
+        return false;
+      }
+    }).finally(() => { refreshPromise = null; });
+  }
+  return refreshPromise;
+}
+
+// Fetch with the access token, refreshing it once if it has expired
+async function authFetch(url, options = {}) {
+  const refreshToken = localStorage.getItem('refreshToken');
+  const response = await fetch(url, options);
+  if (response.status === 401 && await refreshAccessToken(refreshToken)) {
+    return fetch(url, { ...options, headers: getAuthHeaders() });
+  }
+  return response;
+}
+
+// Forget the stored session on this device
+function clearSession() {
+  localStorage.removeItem('authToken');
+  localStorage.removeItem('refreshToken');
+  localStorage.removeItem('userId');
+  localStorage.removeItem('username');
+}
+
+// Session could not be renewed: go to the login page without revoking the
+// refresh token, which another tab may still be using
+function redirectToLogin() {
+  window.location.href = 'login.html';
+}
+
+// Logout function
+function logout() {
+  const refreshToken = localStorage.getItem('refreshToken');
+  if (refreshToken) {
+    fetch('http://localhost:8000/logout', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+      keepalive: true
+    }).catch(() => {});
+  }
+  clearSession();
+  window.location.href = 'login.html';
+}
+
+// Boot data: the dashboard prefetched by the login page, or a fresh fetch of url
+async function loadDashboard(url) {
+  const cached = sessionStorage.getItem('dashboard');
+  if (cached) {
+    sessionStorage.removeItem('dashboard');
+    return JSON.parse(cached);
+  }
+  const response = await authFetch(url, {
+    headers: getAuthHeaders()
+  });
+  if (!response.ok) {
+    if (response.status === 401) {
+      redirectToLogin();
+      return null;
+    }
+    throw new Error('Failed to load dashboard');
+  }
+  return response.json();
+}
+
+// Update user info in navbar
+function updateUserInfo() {
+  const username = localStorage.getItem('username');
+  if (username) {
+    document.getElementById('user-info').textContent = `Welcome, ${username}`;
+  }
+}